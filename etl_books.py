@@ -4,7 +4,8 @@
 """
 ETL: Procesa books.txt (titulo;precio;rating;stock) y genera:
 - productos.csv
-- productos.json
+- productos.jsonl (1 objeto JSON por línea; default)
+  o productos.json (lista indentada) con --json-format json
 
 Transformaciones:
 - precio -> float
@@ -17,18 +18,24 @@ Robustez:
 
 from __future__ import annotations
 
+import argparse
 import csv
 import json
 import logging
-import re
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass, fields
 from pathlib import Path
 from typing import Optional
 
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa json de la stdlib
+    orjson = None
+
 
 INPUT_FILE = "books.txt"
 OUTPUT_CSV = "productos.csv"
 OUTPUT_JSON = "productos.json"
+OUTPUT_JSONL = "productos.jsonl"
 LOG_FILE = "etl_errors.log"
 
 DELIMITER = ";"
@@ -43,9 +50,13 @@ RATING_MAP = {
     "Five": 5,
 }
 
+# Símbolos de moneda a eliminar del precio (una sola pasada con str.translate)
+_CURRENCY_STRIP = str.maketrans("", "", "£$")
+
 
 @dataclass
 class Product:
+    """Esquema de un producto; define el orden de columnas de las salidas."""
     title: str
     price: Optional[float]
     rating: Optional[int]
@@ -54,6 +65,12 @@ class Product:
     stock_status: str
 
 
+FIELDNAMES = tuple(f.name for f in fields(Product))
+
+# Fila parseada, en el orden de FIELDNAMES
+Row = tuple[str, Optional[float], Optional[int], str, Optional[int], str]
+
+
 def setup_logger() -> None:
     logging.basicConfig(
         level=logging.INFO,
@@ -73,10 +90,8 @@ def parse_price(price_raw: str) -> Optional[float]:
     if not price_raw:
         return None
 
-    cleaned = price_raw.strip()
-
-    # Quitar símbolo de moneda y espacios (sin asumir solo £)
-    cleaned = cleaned.replace("£", "").replace("$", "").strip()
+    # Quitar símbolo de moneda (sin asumir solo £); float() ya ignora espacios en los extremos
+    cleaned = price_raw.translate(_CURRENCY_STRIP)
 
     try:
         return float(cleaned)
@@ -87,17 +102,17 @@ def parse_price(price_raw: str) -> Optional[float]:
 def parse_rating(rating_raw: str) -> Optional[int]:
     """
     Convierte 'One', 'Two', ... a int.
-    Retorna None si no está en el mapa.
+    Espera el valor ya sin espacios (parse_line hace el strip).
+    Retorna None si no está en el mapa (incluye el string vacío).
     """
-    if not rating_raw:
-        return None
-    return RATING_MAP.get(rating_raw.strip())
+    return RATING_MAP.get(rating_raw)
 
 
 def parse_stock(stock_raw: str) -> tuple[Optional[int], str]:
     """
     Normaliza el stock.
     Entrada típica: 'In stock (22 available)' o 'Out of stock'
+    (se busca 'in stock' / 'out of stock' en cualquier posición del texto)
     Salida:
       - stock_qty: int si se encuentra número, si no None
       - stock_status: 'IN_STOCK', 'OUT_OF_STOCK', 'UNKNOWN'
@@ -110,8 +125,12 @@ def parse_stock(stock_raw: str) -> tuple[Optional[int], str]:
 
     if "in stock" in lower:
         # Extraer el número si está presente: (22 available)
-        match = re.search(r"\((\d+)\s+available\)", lower)
-        qty = int(match.group(1)) if match else None
+        # Equivale a la regex \((\d+)\s+available\) sobre el texto en minúsculas
+        _, sep, rest = lower.partition("(")
+        head, sep_qty, _ = rest.partition("available)")
+        num_str = head.rstrip()
+        valid = sep and sep_qty and num_str.isdecimal() and len(num_str) < len(head)
+        qty = int(num_str) if valid else None
         return qty, "IN_STOCK"
 
     if "out of stock" in lower:
@@ -121,33 +140,40 @@ def parse_stock(stock_raw: str) -> tuple[Optional[int], str]:
     return None, "UNKNOWN"
 
 
-def parse_line(line: str, line_no: int) -> Optional[Product]:
+def parse_line(line: str, line_no: int) -> Optional[Row]:
     """
     Parsea una línea del archivo books.txt:
       titulo;precio;rating;stock
-    Retorna Product o None si la línea es inválida.
+    Retorna la fila (tupla en orden de FIELDNAMES) o None si la línea es inválida.
     """
-    raw = line.rstrip("\n")
-    if not raw.strip():
+    # Línea vacía o solo espacios (isspace no crea un string nuevo como strip)
+    if not line or line.isspace():
         return None
 
-    parts = raw.split(DELIMITER)
+    parts = line.split(DELIMITER)
 
     if len(parts) != 4:
         logging.warning(
             "Linea invalida (esperado 4 columnas) | line=%s | contenido=%r",
             line_no,
-            raw,
+            line,
         )
         return None
 
-    title_raw, price_raw, rating_raw, stock_raw = [p.strip() for p in parts]
+    # Columnas fijas: desempaquetado directo + strip por campo (sin lista intermedia).
+    # El strip de stock_raw también quita un posible "\n" final.
+    title_raw, price_raw, rating_raw, stock_raw = parts
+    title_raw = title_raw.strip()
 
     # Título: si viene vacío, lo consideramos inválido (pero podrías cambiar esto)
     if not title_raw:
-        logging.warning("Titulo vacío | line=%s | contenido=%r", line_no, raw)
+        logging.warning("Titulo vacío | line=%s | contenido=%r", line_no, line)
         return None
 
+    price_raw = price_raw.strip()
+    rating_raw = rating_raw.strip()
+    stock_raw = stock_raw.strip()
+
     price = parse_price(price_raw)
     if price is None and price_raw:
         logging.warning("Precio no convertible | line=%s | valor=%r", line_no, price_raw)
@@ -158,72 +184,98 @@ def parse_line(line: str, line_no: int) -> Optional[Product]:
 
     stock_qty, stock_status = parse_stock(stock_raw)
 
-    return Product(
-        title=title_raw,
-        price=price,
-        rating=rating,
-        stock_raw=stock_raw,
-        stock_qty=stock_qty,
-        stock_status=stock_status,
-    )
+    return title_raw, price, rating, stock_raw, stock_qty, stock_status
 
 
-def read_products(input_path: str) -> list[Product]:
-    """Lee el archivo de entrada y devuelve la lista de productos válidos."""
-    products: list[Product] = []
+def read_products(input_path: str) -> list[Row]:
+    """Lee el archivo de entrada y devuelve los productos válidos (filas en orden de FIELDNAMES)."""
+    rows: list[Row] = []
     path = Path(input_path)
 
     if not path.exists():
         logging.error("No existe el archivo de entrada: %s", input_path)
-        return products
-
-    with path.open("r", encoding="utf-8") as f:
-        for i, line in enumerate(f, start=1):
-            try:
-                product = parse_line(line, i)
-                if product is not None:
-                    products.append(product)
-            except Exception as exc:
-                logging.error("Error parseando linea %s | %r | %s", i, line, exc)
-
-    return products
-
-
-def write_csv(products: list[Product], output_path: str) -> None:
-    """Escribe productos en CSV."""
-    fieldnames = [
-        "title",
-        "price",
-        "rating",
-        "stock_raw",
-        "stock_qty",
-        "stock_status",
-    ]
+        return rows
+
+    # Lectura y decodificación del archivo completo de una vez (no línea a línea).
+    # read_text normaliza los saltos de línea (\r\n -> \n) igual que la iteración en modo texto.
+    lines = path.read_text(encoding="utf-8").split("\n")
+
+    append = rows.append
+    for i, line in enumerate(lines, start=1):
+        try:
+            row = parse_line(line, i)
+        except Exception as exc:
+            logging.error("Error parseando linea %s | %r | %s", i, line, exc)
+            continue
+        if row is not None:
+            append(row)
 
+    return rows
+
+
+def write_csv(rows: list[Row], output_path: str) -> None:
+    """Escribe productos (filas en orden de FIELDNAMES) en CSV."""
     with open(output_path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames,delimiter=";")
-        writer.writeheader()
-        for p in products:
-            writer.writerow(asdict(p))
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(FIELDNAMES)
+        writer.writerows(rows)
+
 
+def write_json(rows: list[Row], output_path: str) -> None:
+    """Escribe productos (filas en orden de FIELDNAMES) en JSON (lista de objetos)."""
+    data = [dict(zip(FIELDNAMES, row)) for row in rows]
+
+    if orjson is not None:
+        # orjson devuelve bytes UTF-8 ya indentados
+        with open(output_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
 
-def write_json(products: list[Product], output_path: str) -> None:
-    """Escribe productos en JSON (lista de objetos)."""
-    data = [asdict(p) for p in products]
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
+def write_jsonl(rows: list[Row], output_path: str) -> None:
+    """Escribe productos (filas en orden de FIELDNAMES) en JSON Lines (1 objeto por línea)."""
+    if orjson is not None:
+        dumps = orjson.dumps
+        with open(output_path, "wb", buffering=1 << 20) as f:
+            f.writelines(dumps(dict(zip(FIELDNAMES, row))) + b"\n" for row in rows)
+        return
+
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        for row in rows:
+            f.write(json.dumps(dict(zip(FIELDNAMES, row)), ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ETL de books.txt")
+    parser.add_argument(
+        "--json-format",
+        choices=["jsonl", "json"],
+        default="jsonl",
+        help=f"jsonl={OUTPUT_JSONL} (default) | json={OUTPUT_JSON} (lista indentada)"
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
     setup_logger()
+    args = parse_args()
 
-    products = read_products(INPUT_FILE)
-    logging.info("Productos válidos: %s", len(products))
+    # Las mismas filas se comparten entre todos los writers
+    rows = read_products(INPUT_FILE)
+    logging.info("Productos válidos: %s", len(rows))
 
-    write_csv(products, OUTPUT_CSV)
-    write_json(products, OUTPUT_JSON)
+    write_csv(rows, OUTPUT_CSV)
+    if args.json_format == "json":
+        output_json = OUTPUT_JSON
+        write_json(rows, output_json)
+    else:
+        output_json = OUTPUT_JSONL
+        write_jsonl(rows, output_json)
 
-    logging.info("Generado: %s y %s", OUTPUT_CSV, OUTPUT_JSON)
+    logging.info("Generado: %s y %s", OUTPUT_CSV, output_json)
 
 
 if __name__ == "__main__":
@@ -18,13 +18,36 @@ REQUISITOS:
 - Exporta TXT separado por ';'
 """
 
+import re
 import time
+import queue
+import atexit
 import logging
 import argparse
+import threading
+import multiprocessing
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from logging.handlers import QueueHandler, QueueListener
 from urllib.parse import urljoin
 
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"  # parser en C, mucho más rápido que html.parser
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+try:
+    from requests_cache import CachedSession
+except ImportError:  # requests-cache es opcional: sin él no hay caché en disco
+    CachedSession = None
 
 
 BASE_URL = "http://books.toscrape.com/"
@@ -33,31 +56,149 @@ START_PAGE = "catalogue/page-1.html"
 OUTPUT_FILE = "books.txt"
 URLS_FILE = "product_urls.txt"
 LOG_FILE = "scraper_errors.log"
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
+
+# Caché HTTP en disco (SQLite): las re-ejecuciones no vuelven a descargar páginas
+CACHE_FILE = "http_cache.sqlite"
+CACHE_EXPIRE_AFTER = timedelta(days=7)
+
+# Botón "next" del catálogo: <li class="next"><a href="page-2.html">next</a></li>
+_NEXT_RE = re.compile(r'<li class="next">\s*<a href="([^"]+)"')
 
 SLEEP_BETWEEN_LIST_PAGES = 0.8
 SLEEP_BETWEEN_PRODUCT_PAGES = 0.6
 
+# Descargas de productos en paralelo (default de --jobs). La pausa entre productos
+# se respeta de forma global (token bucket compartido), no por hilo.
+PRODUCT_FETCH_WORKERS = 8
+
+# Procesos de parseo: el token bucket limita la descarga a ~1.7 páginas/s, así que
+# unos pocos procesos bastan. Se crean con "spawn" (no fork): hacer fork con los hilos
+# de descarga y el QueueListener vivos puede heredar locks tomados y bloquear al hijo.
+PARSE_WORKERS = 2
+
+# Escritura de OUTPUT_FILE: buffer de 1 MiB y volcado cada N líneas
+WRITE_BUFFER_SIZE = 1 << 20
+WRITE_BATCH_LINES = 1000
+
 TIMEOUT = 20
 HEADERS = {
-    "User-Agent": "Mozilla/5.0 (compatible; polite-scraper/1.0; +https://example.com)"
+    "User-Agent": "Mozilla/5.0 (compatible; polite-scraper/1.0; +https://example.com)",
 }
 
+# Conexiones keep-alive reutilizables (>= hilos de descarga) y reintentos ante 5xx.
+# Los reintentos los hace urllib3 dentro de la misma llamada (con backoff) y no pasan
+# por el token bucket: una petición limitada puede acabar en hasta 1 + total envíos.
+HTTP_POOL_SIZE = 32
+HTTP_RETRIES = Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+
+
+class TokenBucket:
+    """
+    Limitador de tasa compartido entre hilos.
+    Entrega como máximo `rate` tokens por segundo (con ráfagas de hasta `capacity`).
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Toma un token; si no hay, reserva el siguiente y espera (fuera del lock) hasta que llegue."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _log_handlers() -> list[logging.Handler]:
+    """Handlers de salida: archivo de log + consola, con el formato LOG_FORMAT."""
+    handlers: list[logging.Handler] = [
+        logging.FileHandler(LOG_FILE, encoding="utf-8"),
+        logging.StreamHandler()
+    ]
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
 
 def setup_logger() -> None:
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s | %(levelname)s | %(message)s",
-        handlers=[
-            logging.FileHandler(LOG_FILE, encoding="utf-8"),
-            logging.StreamHandler()
-        ],
+    """
+    El logger solo encola los registros; un QueueListener en un hilo aparte
+    los escribe en archivo y consola, sacando la E/S del bucle de scraping.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *_log_handlers())
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+
+    listener.start()
+    atexit.register(listener.stop)
+
+
+def setup_worker_logger() -> None:
+    """
+    Logging de los procesos de parseo: handlers directos, ya que el
+    QueueListener (y su cola) solo existen en el proceso principal.
+    """
+    logging.basicConfig(level=logging.INFO, handlers=_log_handlers(), force=True)
+
+
+def build_session(use_cache: bool = True, pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """
+    Crea la sesión HTTP con pool de conexiones, reintentos y headers por defecto.
+    pool_size debe ser >= número de hilos de descarga para que ninguno abra conexiones de más.
+    Si requests-cache está instalado (y use_cache), las respuestas GET se guardan en CACHE_FILE.
+    """
+    if use_cache and CachedSession is not None:
+        session = CachedSession(CACHE_FILE, expire_after=CACHE_EXPIRE_AFTER, allowable_methods=("GET",))
+    else:
+        session = requests.Session()
+    session.headers.update(HEADERS)
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=HTTP_RETRIES,
     )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_cached(session: requests.Session, url: str) -> str | None:
+    """
+    Retorna el HTML solo si hay una respuesta vigente (no expirada) en la caché HTTP,
+    sin salir a la red. None si no hay caché, la URL no está o ya expiró.
+    """
+    if getattr(session, "cache", None) is None:
+        return None
+    try:
+        # only_if_cached: requests-cache responde 504 en vez de hacer la petición
+        response = session.get(url, timeout=TIMEOUT, only_if_cached=True)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200 or not getattr(response, "from_cache", False):
+        return None
+
+    response.encoding = "utf-8"
+    return response.text
 
 
 def fetch(session: requests.Session, url: str) -> str | None:
     """Descarga HTML y retorna texto. Si falla, registra y devuelve None."""
     try:
-        response = session.get(url, headers=HEADERS, timeout=TIMEOUT)
+        response = session.get(url, timeout=TIMEOUT)
         response.raise_for_status()
 
         # FIX: asegurar que se decodifique como UTF-8 (evita Â£, Ã©, etc.)
@@ -65,7 +206,7 @@ def fetch(session: requests.Session, url: str) -> str | None:
 
         return response.text
     except requests.RequestException as e:
-        logging.error(f"Request failed: {url} | {e}")
+        logging.error("Request failed: %s | %s", url, e)
         return None
 
 def safe_select_text(soup: BeautifulSoup, css: str) -> str | None:
@@ -94,9 +235,8 @@ def parse_rating_word(soup: BeautifulSoup) -> str | None:
     return None
 
 
-def get_product_links_from_list_page(list_page_html: str, list_page_url: str) -> list[str]:
+def get_product_links_from_list_page(soup: BeautifulSoup, list_page_url: str) -> list[str]:
     """Devuelve lista de URLs absolutas de productos desde una página de catálogo."""
-    soup = BeautifulSoup(list_page_html, "html.parser")
     links: list[str] = []
 
     for a in soup.select("article.product_pod h3 a"):
@@ -110,15 +250,24 @@ def get_product_links_from_list_page(list_page_html: str, list_page_url: str) ->
 
 
 def get_next_page_url(list_page_html: str, list_page_url: str) -> str | None:
-    """Detecta el botón next; retorna URL absoluta de la siguiente página o None."""
-    soup = BeautifulSoup(list_page_html, "html.parser")
-    next_a = soup.select_one("li.next a")
-    if not next_a:
-        return None
-    href = next_a.get("href")
-    if not href:
+    """
+    Detecta el botón next; retorna URL absoluta de la siguiente página o None.
+    Usa una regex sobre el HTML crudo: basta un href, no hace falta el árbol.
+    """
+    match = _NEXT_RE.search(list_page_html)
+    if not match:
         return None
-    return urljoin(list_page_url, href)
+    return urljoin(list_page_url, match.group(1))
+
+
+def parse_list_page(list_page_html: str, list_page_url: str) -> tuple[list[str], str | None]:
+    """
+    Parsea una página de catálogo una sola vez y retorna:
+    - URLs absolutas de productos
+    - URL absoluta de la siguiente página (o None)
+    """
+    soup = BeautifulSoup(list_page_html, HTML_PARSER)
+    return get_product_links_from_list_page(soup, list_page_url), get_next_page_url(list_page_html, list_page_url)
 
 
 def parse_product_detail(product_html: str, product_url: str) -> tuple[str | None, str | None, str | None, str | None]:
@@ -129,7 +278,7 @@ def parse_product_detail(product_html: str, product_url: str) -> tuple[str | Non
     - rating: palabra en class de p.star-rating (One/Two/Three/Four/Five)
     - disponibilidad: p.availability (ej: "In stock (22 available)")
     """
-    soup = BeautifulSoup(product_html, "html.parser")
+    soup = BeautifulSoup(product_html, HTML_PARSER)
 
     title = safe_select_text(soup, "div.product_main h1")
     price = safe_select_text(soup, "div.product_main p.price_color")
@@ -140,13 +289,13 @@ def parse_product_detail(product_html: str, product_url: str) -> tuple[str | Non
 
     # Robustez: registrar missing sin detener
     if title is None:
-        logging.warning(f"Missing title | {product_url}")
+        logging.warning("Missing title | %s", product_url)
     if price is None:
-        logging.warning(f"Missing price | {product_url}")
+        logging.warning("Missing price | %s", product_url)
     if rating is None:
-        logging.warning(f"Missing rating | {product_url}")
+        logging.warning("Missing rating | %s", product_url)
     if availability is None:
-        logging.warning(f"Missing availability | {product_url}")
+        logging.warning("Missing availability | %s", product_url)
 
     return title, price, rating, availability
 
@@ -160,23 +309,27 @@ def collect_product_urls(session: requests.Session) -> list[str]:
     current_url = urljoin(BASE_URL, START_PAGE)
 
     while current_url:
-        logging.info(f"[urls] Catalog page: {current_url}")
-        html = fetch(session, current_url)
+        logging.info("[urls] Catalog page: %s", current_url)
+        html = fetch_cached(session, current_url)
+        from_cache = html is not None
+        if not from_cache:
+            html = fetch(session, current_url)
         if html is None:
-            logging.error(f"[urls] Stopping due to fetch error: {current_url}")
+            logging.error("[urls] Stopping due to fetch error: %s", current_url)
             break
 
-        page_links = get_product_links_from_list_page(html, current_url)
-        logging.info(f"[urls] Found products: {len(page_links)}")
+        page_links, next_url = parse_list_page(html, current_url)
+        logging.info("[urls] Found products: %s", len(page_links))
         urls.extend(page_links)
 
-        time.sleep(SLEEP_BETWEEN_LIST_PAGES)
-        current_url = get_next_page_url(html, current_url)
+        if not from_cache:
+            time.sleep(SLEEP_BETWEEN_LIST_PAGES)
+        current_url = next_url
 
     # Deduplicación conservadora (por si acaso) sin alterar el contenido de los campos scrapeados
     # (Las URLs duplicadas solo causarían repetición de filas, esto lo evita.)
     urls = list(dict.fromkeys(urls))
-    logging.info(f"[urls] Total unique product URLs collected: {len(urls)}")
+    logging.info("[urls] Total unique product URLs collected: %s", len(urls))
     return urls
 
 
@@ -193,40 +346,110 @@ def load_urls(path: str) -> list[str]:
         with open(path, "r", encoding="utf-8") as f:
             return [line.strip() for line in f if line.strip()]
     except FileNotFoundError:
-        logging.error(f"URLs file not found: {path}")
+        logging.error("URLs file not found: %s", path)
         return []
 
 
-def scrape_from_urls(session: requests.Session, urls: list[str], output_path: str) -> tuple[int, int]:
+def fetch_product_pages(
+    session: requests.Session,
+    urls: list[str],
+    jobs: int = PRODUCT_FETCH_WORKERS,
+) -> Iterator[tuple[str, str | None]]:
+    """
+    Descarga las páginas de producto con `jobs` hilos (la carga es de red).
+    Devuelve (url, html) en el mismo orden de urls; html es None si falló.
+    Polite: todos los hilos comparten un token bucket, así que en conjunto no se
+    supera 1 petición cada SLEEP_BETWEEN_PRODUCT_PAGES (salvo respuestas en caché
+    y reintentos ante 5xx, ver HTTP_RETRIES).
+    """
+    bucket = TokenBucket(rate=1 / SLEEP_BETWEEN_PRODUCT_PAGES)
+
+    def polite_fetch(url: str) -> tuple[str, str | None]:
+        html = fetch_cached(session, url)
+        if html is None:
+            bucket.acquire()
+            html = fetch(session, url)
+        return url, html
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        try:
+            yield from pool.map(polite_fetch, urls)
+        finally:
+            # Si el consumidor se detiene (error o Ctrl+C), no seguir descargando lo pendiente
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_one(page: tuple[str, str]) -> tuple[str | None, str | None, str | None, str | None] | None:
+    """
+    Tarea del pool de procesos: parsea una página (url, html) descargada.
+    Retorna los campos de parse_product_detail o None si el parseo falla.
+    """
+    product_url, product_html = page
+    try:
+        return parse_product_detail(product_html, product_url)
+    except Exception as e:
+        logging.error("[scrape] Parse failed: %s | %s", product_url, e)
+        return None
+
+
+def scrape_from_urls(
+    session: requests.Session,
+    urls: list[str],
+    output_path: str,
+    jobs: int = PRODUCT_FETCH_WORKERS,
+) -> tuple[int, int]:
     """
     Visita cada URL de producto y escribe OUTPUT en formato:
       titulo;precio;rating;disponibilidad
+    Descarga en paralelo (hilos) y, a medida que llegan las páginas, las parsea en
+    paralelo (procesos); la escritura se hace solo en el proceso principal y en el
+    orden de urls. Si la corrida se interrumpe, OUTPUT conserva lo ya scrapeado.
     Retorna: (productos_procesados_ok, lineas_escritas)
     """
     total_products = 0
     total_lines_written = 0
 
-    with open(output_path, "w", encoding="utf-8") as f_out:
-        for product_url in urls:
-            time.sleep(SLEEP_BETWEEN_PRODUCT_PAGES)
-
-            product_html = fetch(session, product_url)
-            if product_html is None:
-                logging.error(f"[scrape] Skipping product due to fetch error: {product_url}")
-                continue
-
-            try:
-                title, price, rating, availability = parse_product_detail(product_html, product_url)
+    buf: list[str] = []
+    append = buf.append
+    pending: deque[Future] = deque()
 
-                # se guarda sin transformación; si falta de deja vacío
-                line = f"{title or ''};{price or ''};{rating or ''};{availability or ''}\n"
-                f_out.write(line)
+    def collect(future: Future) -> None:
+        nonlocal total_products, total_lines_written
+        fields = future.result()
+        if fields is None:
+            return
 
-                total_lines_written += 1
-                total_products += 1
-            except Exception as e:
-                logging.error(f"[scrape] Parse failed: {product_url} | {e}")
-                continue
+        # se guarda sin transformación; si falta de deja vacío
+        append(";".join([field or "" for field in fields]) + "\n")
+
+        total_lines_written += 1
+        total_products += 1
+
+    with open(output_path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f_out, \
+            ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=setup_worker_logger,
+            ) as pool:
+        try:
+            for product_url, product_html in fetch_product_pages(session, urls, jobs):
+                if product_html is None:
+                    logging.error("[scrape] Skipping product due to fetch error: %s", product_url)
+                    continue
+                pending.append(pool.submit(_parse_one, (product_url, product_html)))
+
+                # Recoger (en orden) los parseos ya terminados mientras se sigue descargando
+                while pending and pending[0].done():
+                    collect(pending.popleft())
+
+                if len(buf) >= WRITE_BATCH_LINES:
+                    f_out.writelines(buf)
+                    buf.clear()
+
+            while pending:
+                collect(pending.popleft())
+        finally:
+            f_out.writelines(buf)
 
     return total_products, total_lines_written
 
@@ -241,18 +464,28 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument("--urls-file", default=URLS_FILE, help="Archivo para guardar/leer URLs (1 por línea).")
     parser.add_argument("--output-file", default=OUTPUT_FILE, help="Archivo TXT de salida (separado por ';').")
-    return parser.parse_args()
+    parser.add_argument("--no-cache", action="store_true", help=f"No usar la caché HTTP en disco ({CACHE_FILE}).")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=PRODUCT_FETCH_WORKERS,
+        help=f"Hilos de descarga de productos (default {PRODUCT_FETCH_WORKERS}); la tasa global se mantiene."
+    )
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs debe ser >= 1")
+    return args
 
 
 def main():
     setup_logger()
     args = parse_args()
-    session = requests.Session()
+    session = build_session(use_cache=not args.no_cache, pool_size=max(args.jobs, HTTP_POOL_SIZE))
 
     if args.mode == "urls":
         urls = collect_product_urls(session)
         save_urls(urls, args.urls_file)
-        logging.info(f"[urls] Saved: {len(urls)} URLs -> {args.urls_file}")
+        logging.info("[urls] Saved: %s URLs -> %s", len(urls), args.urls_file)
         return
 
     if args.mode == "scrape":
@@ -260,17 +493,17 @@ def main():
         if not urls:
             logging.error("[scrape] No URLs to process. Run with --mode urls first (or use --mode all).")
             return
-        processed, lines = scrape_from_urls(session, urls, args.output_file)
-        logging.info(f"[scrape] Done. Products processed: {processed}. Lines written: {lines}. Output: {args.output_file}")
+        processed, lines = scrape_from_urls(session, urls, args.output_file, args.jobs)
+        logging.info("[scrape] Done. Products processed: %s. Lines written: %s. Output: %s", processed, lines, args.output_file)
         return
 
     # mode == "all"
     urls = collect_product_urls(session)
     save_urls(urls, args.urls_file)
-    logging.info(f"[all] Saved: {len(urls)} URLs -> {args.urls_file}")
+    logging.info("[all] Saved: %s URLs -> %s", len(urls), args.urls_file)
 
-    processed, lines = scrape_from_urls(session, urls, args.output_file)
-    logging.info(f"[all] Done. Products processed: {processed}. Lines written: {lines}. Output: {args.output_file}")
+    processed, lines = scrape_from_urls(session, urls, args.output_file, args.jobs)
+    logging.info("[all] Done. Products processed: %s. Lines written: %s. Output: %s", processed, lines, args.output_file)
 
 
 if __name__ == "__main__":